@@ -1,10 +1,21 @@
 import os
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 from datetime import timedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 # Import blueprints
 from routes.auth import auth_bp
 from routes.health import health_bp
@@ -15,13 +26,42 @@ from routes.criteria import criteria_bp
 # Import database connection
 from utils.db_connection import setup_mongodb_connection
 
+# Import at module scope so the import cost is paid once at startup (and
+# shared by forked workers under gunicorn --preload) rather than on the
+# first request into each worker
+from utils.file_utils import setup_upload_folder, start_upload_janitor
+from utils.jwt_utils import check_if_token_in_blacklist, setup_jwt_error_handlers
+
 # Load environment variables
 load_dotenv()
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which serializes the large
+    comparison_details payloads several times faster than stdlib json"""
+
+    def dumps(self, obj, **kwargs):
+        # OPT_NON_STR_KEYS covers the integer-keyed scoring_levels dicts
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 def create_app():
     """Factory function to create the Flask application"""
     app = Flask(__name__)
-    
+
+    # Use orjson for request/response JSON when available
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+    # Compress JSON responses when the extension is available - the
+    # comparison_details payloads are highly redundant text and shrink
+    # several-fold on the wire
+    if Compress is not None:
+        app.config['COMPRESS_MIMETYPES'] = ['application/json', 'application/x-ndjson']
+        app.config['COMPRESS_MIN_SIZE'] = 1024
+        Compress(app)
+
     # load that FE_URL from .env
     frontend_url = os.environ.get('FE_URL', 'http://localhost:8080')
     print(f"Allowing CORS for: {frontend_url}")
@@ -36,9 +76,19 @@ def create_app():
     # Setup MongoDB connection
     db = setup_mongodb_connection()
     
-    # Configure uploads folder
-    from utils.file_utils import setup_upload_folder
+    # Configure uploads folder and start the background cleanup of stale
+    # uploads so no request has to pay for the unlink loop
     app.config['UPLOAD_FOLDER'] = setup_upload_folder()
+    start_upload_janitor(app.config['UPLOAD_FOLDER'])
+
+    # Reject oversized upload bodies before they are buffered rather than
+    # after - uploads are streamed to disk, so this is the only backstop
+    app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100 MB
+
+    # When running behind nginx/Apache with sendfile support, let the proxy
+    # serve file downloads directly (zero-copy) instead of streaming the
+    # bytes through Python. Off by default for the dev server.
+    app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true')
     
     # Configure JWT
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
@@ -46,11 +96,9 @@ def create_app():
     jwt = JWTManager(app)
     
     # Setup JWT token blocklist
-    from utils.jwt_utils import jwt_blacklist, check_if_token_in_blacklist
     jwt.token_in_blocklist_loader(check_if_token_in_blacklist)
-    
+
     # Setup JWT error handlers
-    from utils.jwt_utils import setup_jwt_error_handlers
     setup_jwt_error_handlers(jwt)
     
     # Register blueprints
@@ -68,11 +116,17 @@ app = create_app()
 if __name__ == '__main__':
     # Get port from environment variable or use default
     port = int(os.environ.get('PORT', 5003))
-    
+
+    # The Werkzeug dev server (and its reloader) is for development only.
+    # In production run e.g.: gunicorn -w 4 --threads 8 -b 0.0.0.0:$PORT api:app
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true')
+
     print(f"Starting backend server on port {port}...")
     print(f"API will be available at: http://localhost:{port}/api/health")
     print(f"Temporary uploads directory: {app.config['UPLOAD_FOLDER']}")
     print(f"OpenAI API key status: {'Configured' if os.getenv('OPENAI_API_KEY') else 'Not configured'}")
     
     # Use the host 0.0.0.0 to make the server externally visible
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    # threaded=True lets slow I/O-bound requests (OpenAI calls, MongoDB
+    # writes, PDF reads) overlap instead of serializing on one worker
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
\ No newline at end of file
@@ -1,10 +1,22 @@
 
 from typing import Dict, List, Any, Tuple
+import hashlib
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from .document_comparator import DocumentComparator
-from .mergesort_ranking import mergesort_with_comparator
+
+# Version tag mixed into every judgment cache key. Bump it whenever the
+# PromptGenerator templates or the stored result schema change, so stale
+# verdicts from the old prompts can never be served against the new ones.
+JUDGMENT_CACHE_VERSION = 1
+
+# Entries older than this are expired by a TTL index on created_at -
+# cheap to recompute, and unbounded retention would otherwise accumulate
+# one entry per distinct (criteria, pair) forever
+JUDGMENT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
 
 class ComparisonEngine:
     """
@@ -16,12 +28,12 @@ class ComparisonEngine:
     3. Implementing the merge sort algorithm to rank documents
     """
     
-    def __init__(self, documents: Dict[str, str], criteria: List[Dict[str, Any]], 
+    def __init__(self, documents: Dict[str, str], criteria: List[Dict[str, Any]],
                 openai_api_key: str, pdf_processor=None, use_custom_prompt=False,
-                model_name="gpt-4.1-mini"):
+                model_name="gpt-4.1-mini", db=None):
         """
         Initialize the comparison engine.
-        
+
         Args:
             documents: Dictionary mapping document names to their content
             criteria: List of criteria dictionaries with name, description, and weightage
@@ -29,6 +41,7 @@ class ComparisonEngine:
             pdf_processor: Optional PDFProcessor instance for section extraction
             use_custom_prompt: Whether to use a custom prompt for evaluation
             model_name: The model to use for evaluation
+            db: Optional MongoDB database for the persistent judgment cache
         """
         self.documents = documents
         self.criteria = criteria
@@ -37,7 +50,49 @@ class ComparisonEngine:
         self.use_custom_prompt = use_custom_prompt
         self.comparison_results = []  # Store all pairwise comparison results
         self.model_name = model_name
-        
+        # Comparisons are symmetric, so results are also indexed by the
+        # unordered pair for O(1) duplicate detection instead of scanning
+        # comparison_results on every call
+        self._pair_cache = {}
+
+        # Persistent cache of pairwise judgments, keyed by document content
+        # and criteria rather than filenames - a re-run over the same PDFs
+        # (or the same pair met again in another sort) skips the API calls.
+        # Custom prompts are free-form and rarely repeat verbatim, so those
+        # runs are not worth caching.
+        self.judgment_cache = None
+        if db is not None and not use_custom_prompt:
+            self.judgment_cache = db["judgment_cache"]
+            try:
+                self.judgment_cache.create_index(
+                    "created_at",
+                    expireAfterSeconds=JUDGMENT_CACHE_TTL_SECONDS,
+                    background=True,
+                )
+            except Exception as e:
+                print(f"Warning: could not create judgment cache TTL index: {e}")
+        # Hash every document once up front - the cache key helpers reuse
+        # these across all O(n log n) pairwise lookups
+        self._doc_hashes = {
+            name: hashlib.sha256(content.encode('utf-8')).hexdigest()
+            for name, content in documents.items()
+        }
+        # The fingerprint covers everything besides document content that
+        # shapes a verdict: the criteria, the model answering, and the
+        # prompt-schema version - a model bump or template change starts
+        # a fresh keyspace instead of replaying old verdicts
+        self._criteria_fingerprint = hashlib.sha256(
+            json.dumps(
+                {
+                    "criteria": criteria,
+                    "model": model_name,
+                    "version": JUDGMENT_CACHE_VERSION,
+                },
+                sort_keys=True,
+                default=str,
+            ).encode('utf-8')
+        ).hexdigest()
+
         # Validate API key before proceeding
         self._validate_api_key()
         
@@ -84,10 +139,42 @@ class ComparisonEngine:
             if existing_result:
                 print(f"Using cached comparison for {doc1} vs {doc2}")
                 return existing_result
-            
+
+            # Identical content can't produce a meaningful winner - call it
+            # a tie without spending an LLM round trip (re-uploaded copies
+            # of the same PDF are common)
+            if self._doc_hashes.get(doc1) == self._doc_hashes.get(doc2):
+                print(f"Identical content for {doc1} and {doc2} - recording a tie")
+                tie_result = {
+                    "document_a": doc1,
+                    "document_b": doc2,
+                    "winner": "Tie",
+                    "error": "N/A",
+                    "evaluation_details": {
+                        "criterion_evaluations": [],
+                        "overall_scores": {"document_a": 0, "document_b": 0},
+                        "overall_winner": "Tie",
+                        "explanation": "The documents have identical content, so they are tied."
+                    },
+                    "criterion_scores": {}
+                }
+                self.comparison_results.append(tie_result)
+                self._pair_cache[frozenset((doc1, doc2))] = tie_result
+                return tie_result
+
+            # Check the persistent judgment cache next
+            cached_result = self._lookup_judgment_cache(doc1, doc2)
+            if cached_result:
+                print(f"Judgment cache hit for {doc1} vs {doc2}")
+                self.comparison_results.append(cached_result)
+                self._pair_cache[frozenset((doc1, doc2))] = cached_result
+                return cached_result
+
             # Perform the actual comparison
             result = self.document_comparator.compare(doc1, doc2)
             self.comparison_results.append(result)
+            self._pair_cache[frozenset((doc1, doc2))] = result
+            self._store_judgment(doc1, doc2, result)
             return result
         except Exception as e:
             error_msg = f"Error comparing {doc1} vs {doc2}: {str(e)}"
@@ -101,67 +188,277 @@ class ComparisonEngine:
                 "error": error_msg
             }
             self.comparison_results.append(error_result)
+            self._pair_cache[frozenset((doc1, doc2))] = error_result
             return error_result
     
     def _find_existing_comparison(self, doc1: str, doc2: str) -> Dict[str, Any]:
         """
         Check if a comparison between these documents already exists.
-        
+
         Args:
             doc1: Name of the first document
             doc2: Name of the second document
-            
+
         Returns:
             Existing comparison result or None
         """
-        for result in self.comparison_results:
-            # Check direct match
-            if result["document_a"] == doc1 and result["document_b"] == doc2:
-                return result
-            
-            # Check reverse match (need to invert the result)
-            if result["document_a"] == doc2 and result["document_b"] == doc1:
-                # Create inverted result
-                inverted_result = result.copy()
-                inverted_result["document_a"] = doc1
-                inverted_result["document_b"] = doc2
-                
-                # Invert winner
-                if result["winner"] == result["document_a"]:
-                    inverted_result["winner"] = doc1
-                elif result["winner"] == result["document_b"]:
-                    inverted_result["winner"] = doc2
-                    
-                return inverted_result
-                
-        return None
-    
+        result = self._pair_cache.get(frozenset((doc1, doc2)))
+        if result is None:
+            return None
+
+        # Direct match
+        if result["document_a"] == doc1 and result["document_b"] == doc2:
+            return result
+
+        # Reverse match - invert the stored orientation
+        inverted_result = result.copy()
+        inverted_result["document_a"] = doc1
+        inverted_result["document_b"] = doc2
+
+        # Invert winner
+        if result["winner"] == result["document_a"]:
+            inverted_result["winner"] = doc1
+        elif result["winner"] == result["document_b"]:
+            inverted_result["winner"] = doc2
+
+        return inverted_result
+
+    def _document_hash(self, doc_name: str) -> str:
+        """Content hash for a document, computed once per engine instance"""
+        doc_hash = self._doc_hashes.get(doc_name)
+        if doc_hash is None:
+            content = self.documents.get(doc_name, '')
+            doc_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            self._doc_hashes[doc_name] = doc_hash
+        return doc_hash
+
+    def _judgment_cache_key(self, doc1: str, doc2: str) -> str:
+        """
+        Cache key for a pairwise judgment.
+
+        Built from the criteria fingerprint and the sorted pair of content
+        hashes, so the same two documents hit the same entry regardless of
+        filename or comparison order.
+        """
+        h1, h2 = sorted((self._document_hash(doc1), self._document_hash(doc2)))
+        return hashlib.sha256(
+            f"{self._criteria_fingerprint}:{h1}:{h2}".encode('utf-8')
+        ).hexdigest()
+
+    def _lookup_judgment_cache(self, doc1: str, doc2: str) -> Dict[str, Any]:
+        """
+        Look up a stored judgment for this pair, remapping document names.
+
+        Returns the cached comparison result rewritten in terms of the
+        current doc1/doc2, or None on a miss.
+        """
+        if self.judgment_cache is None:
+            return None
+
+        try:
+            entry = self.judgment_cache.find_one({"_id": self._judgment_cache_key(doc1, doc2)})
+        except Exception as e:
+            print(f"Judgment cache lookup failed: {str(e)}")
+            return None
+
+        if not entry:
+            return None
+
+        stored = entry["result"]
+        # The stored names may differ from the current ones, so map the
+        # stored A/B slots onto doc1/doc2 by content hash
+        if entry.get("document_a_hash") == self._document_hash(doc1):
+            name_map = {stored["document_a"]: doc1, stored["document_b"]: doc2}
+        else:
+            name_map = {stored["document_a"]: doc2, stored["document_b"]: doc1}
+
+        result = dict(stored)
+        result["document_a"] = doc1
+        result["document_b"] = doc2
+        if stored.get("winner") in name_map:
+            result["winner"] = name_map[stored["winner"]]
+        return result
+
+    def _store_judgment(self, doc1: str, doc2: str, result: Dict[str, Any]) -> None:
+        """Persist a successful judgment so future runs can reuse it"""
+        if self.judgment_cache is None:
+            return
+        if result.get("error", "N/A") != "N/A":
+            return
+
+        try:
+            self.judgment_cache.replace_one(
+                {"_id": self._judgment_cache_key(doc1, doc2)},
+                {
+                    "result": result,
+                    "document_a_hash": self._document_hash(doc1),
+                    # BSON Date - the TTL index only expires date fields
+                    "created_at": datetime.now(timezone.utc),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"Judgment cache store failed: {str(e)}")
+
     def compare_with_mergesort(self, documents: List[str]) -> List[str]:
         """
-        Rank documents using mergesort with pairwise comparisons.
-        
+        Rank documents using a level-synchronous (bottom-up) mergesort.
+
+        At each merge level the first head-to-head of every merge is known
+        up front and independent of the others, so those comparisons are
+        issued concurrently before the merges run - the merges then pick
+        the results out of the in-run cache. Later comparisons inside a
+        merge depend on earlier winners and stay sequential.
+
         Args:
             documents: List of document names to compare
-            
+
         Returns:
             Sorted list of documents from best to worst
         """
         start_time = time.time()
         print(f"Starting comparison of {len(documents)} documents using merge sort...")
-        
+
         if len(documents) <= 1:
             return documents
-            
-        comparator = lambda doc1, doc2: self._comparison_function(doc1, doc2)
-        
-        sorted_docs = mergesort_with_comparator(documents, comparator)
-        
+
+        if len(documents) == 2:
+            # One comparison decides a pair - no merge machinery needed
+            first, second = documents
+            sorted_docs = [first, second] if self._comparison_function(first, second) >= 0 else [second, first]
+        elif len(documents) == 3:
+            # Insertion sort: at most three comparisons, no recursion.
+            # Only a strict win inserts before an incumbent - on a tie the
+            # earlier document keeps its spot, matching the merge path's
+            # stability.
+            sorted_docs = [documents[0]]
+            for doc in documents[1:]:
+                for idx in range(len(sorted_docs) + 1):
+                    if idx == len(sorted_docs) or self._comparison_function(doc, sorted_docs[idx]) > 0:
+                        sorted_docs.insert(idx, doc)
+                        break
+        else:
+            runs = [[doc] for doc in documents]
+            while len(runs) > 1:
+                # Prefetch the first pair of each merge at this level. On the
+                # first level every merge needs exactly one comparison, so this
+                # covers half of all comparisons in one concurrent batch.
+                pairs = [(runs[i][0], runs[i + 1][0]) for i in range(0, len(runs) - 1, 2)]
+                if len(pairs) > 1:
+                    with ThreadPoolExecutor(max_workers=min(4, len(pairs))) as executor:
+                        list(executor.map(lambda pair: self.compare_documents(*pair), pairs))
+
+                merged_runs = []
+                for i in range(0, len(runs) - 1, 2):
+                    merged_runs.append(self._merge(runs[i], runs[i + 1]))
+                if len(runs) % 2:
+                    merged_runs.append(runs[-1])
+                runs = merged_runs
+
+            sorted_docs = runs[0]
+
         end_time = time.time()
         duration = end_time - start_time
         print(f"Comparison completed in {duration:.2f} seconds")
         print(f"Final ranking: {sorted_docs}")
-        
+
         return sorted_docs
+
+    def compare_with_single_batch(self, documents: List[str], snippet_chars: int = 2000) -> List[str]:
+        """
+        Rank all documents with one LLM call instead of pairwise sorting.
+
+        Builds a single prompt carrying a snippet of every document and the
+        criteria, and asks for a complete ranking as JSON. Useful for small
+        sets where one round trip beats O(N log N) of them; falls back to
+        compare_with_mergesort whenever the response is unusable.
+
+        Args:
+            documents: List of document names to compare
+            snippet_chars: How much of each document to include in the prompt
+
+        Returns:
+            Sorted list of documents from best to worst
+        """
+        if len(documents) <= 1:
+            return documents
+
+        criteria_lines = "\n".join(
+            f"- {criterion['name']} (weight {criterion.get('weight', 0)}): {criterion['description']}"
+            for criterion in self.criteria
+        )
+        document_sections = "\n\n".join(
+            f"Document: {name}\n{self.documents.get(name, '')[:snippet_chars]}"
+            for name in documents
+        )
+        prompt = (
+            "Rank the following documents from best to worst against these criteria:\n"
+            f"{criteria_lines}\n\n"
+            f"{document_sections}\n\n"
+            "Respond with JSON of the form "
+            '{"ranking": ["<document name>", ...]} listing every document '
+            "exactly once, best first."
+        )
+
+        try:
+            from openai import OpenAI
+            client = OpenAI(api_key=self.openai_api_key)
+            response = client.chat.completions.create(
+                temperature=0.2,
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"}
+            )
+            ranking = json.loads(response.choices[0].message.content).get("ranking", [])
+        except Exception as e:
+            print(f"Single-batch ranking failed ({str(e)}) - falling back to mergesort")
+            return self.compare_with_mergesort(documents)
+
+        # The ranking must be a permutation of the inputs to be trusted
+        valid = [name for name in ranking if name in self.documents]
+        if sorted(valid) != sorted(documents):
+            print("Single-batch ranking incomplete - falling back to mergesort")
+            return self.compare_with_mergesort(documents)
+
+        # Record adjacent pairs so report generation still has comparison
+        # rows to work from
+        for better, worse in zip(valid, valid[1:]):
+            result = {
+                "document_a": better,
+                "document_b": worse,
+                "winner": better,
+                "error": "N/A",
+                "evaluation_details": {
+                    "criterion_evaluations": [],
+                    "overall_scores": {"document_a": 0, "document_b": 0},
+                    "overall_winner": "A",
+                    "explanation": f"{better} was ranked above {worse} in a single batched ranking of all documents."
+                },
+                "criterion_scores": {}
+            }
+            self.comparison_results.append(result)
+            self._pair_cache[frozenset((better, worse))] = result
+
+        print(f"Single-batch ranking: {valid}")
+        return valid
+
+    def _merge(self, left: List[str], right: List[str]) -> List[str]:
+        """Merge two ranked runs using pairwise comparisons"""
+        result = []
+        i = j = 0
+        left_len, right_len = len(left), len(right)
+
+        while i < left_len and j < right_len:
+            if self._comparison_function(left[i], right[j]) >= 0:
+                result.append(left[i])
+                i += 1
+            else:
+                result.append(right[j])
+                j += 1
+
+        result.extend(left[i:])
+        result.extend(right[j:])
+        return result
     
     def _comparison_function(self, doc1: str, doc2: str) -> int:
         """
@@ -176,17 +473,13 @@ class ComparisonEngine:
         """
         if doc1 == doc2:
             return 0
-            
+
         result = self.compare_documents(doc1, doc2)
-        
+
         # If there was an error in comparison
         if result.get("error", "N/A") != "N/A":
             print(f"Error in comparison: {result.get('error')}")
             return 0  # Consider them equal in case of error
-        
-        if result["winner"] == "Tie" or result["winner"] is None:
-            return 0
-        elif result["winner"] == doc1:
-            return 1
-        else:
-            return -1
+
+        # Single dict lookup; Tie, None, or anything unexpected maps to 0
+        return {doc1: 1, doc2: -1}.get(result["winner"], 0)
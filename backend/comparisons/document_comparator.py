@@ -1,5 +1,6 @@
 
 from typing import Dict, List, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import tiktoken
 from .criterion_evaluator import CriterionEvaluator
 from .prompt_generator import PromptGenerator
@@ -14,7 +15,11 @@ class DocumentComparator:
     3. Aggregates results to determine overall winners
     """
     
-    def __init__(self, documents: Dict[str, str], criteria: List[Dict[str, Any]], openai_api_key: str, 
+    # Token allowance for the prompt text around the two documents
+    # (instructions, rubric, headings) - generous on purpose
+    PROMPT_SCAFFOLD_TOKENS = 600
+
+    def __init__(self, documents: Dict[str, str], criteria: List[Dict[str, Any]], openai_api_key: str,
                  pdf_processor=None, use_custom_prompt=False, model_name="gpt-4.1-mini"):
         """
         Initialize the document comparator.
@@ -34,7 +39,10 @@ class DocumentComparator:
         self.use_custom_prompt = use_custom_prompt
         self.model_name = model_name
         self.tokenizer = tiktoken.encoding_for_model("gpt-4")  # Use gpt-4 encoding for token counting
-        
+        # Token counts per document, computed once and reused for every
+        # criterion and pairing instead of re-encoding the full prompt text
+        self._doc_token_counts = {}
+
         # Validate API key before proceeding
         self._validate_api_key()
         
@@ -59,7 +67,15 @@ class DocumentComparator:
             print(f"WARNING: API key appears invalid in DocumentComparator (length: {len(self.openai_api_key)})")
         
         return is_valid
-    
+
+    def _document_tokens(self, doc_name: str, content: str) -> int:
+        """Token count for a document's content, computed once and cached"""
+        count = self._doc_token_counts.get(doc_name)
+        if count is None:
+            count = len(self.tokenizer.encode(content))
+            self._doc_token_counts[doc_name] = count
+        return count
+
     def compare(self, doc1_name: str, doc2_name: str) -> Dict[str, Any]:
         """
         Compare two documents by evaluating each criterion separately.
@@ -93,17 +109,13 @@ class DocumentComparator:
                 "criterion_scores": {}
             }
         
-        # Process each criterion individually
+        # Get full document content once - it is the same for every criterion
+        doc1_content = self.documents[doc1_name]
+        doc2_content = self.documents[doc2_name]
+
+        # Build the prompt for every criterion up front
+        prompts = []
         for criterion in self.criteria:
-            print(f"Processing criterion: {criterion['name']}")
-            criterion_name = criterion['name']
-            criterion_weight = criterion['weight']
-            criterion_id = criterion.get('id', '')
-            
-            # Get full document content for this criterion
-            doc1_content = self.documents[doc1_name]
-            doc2_content = self.documents[doc2_name]
-            
             # Generate a prompt for this criterion
             if self.use_custom_prompt or criterion.get('is_custom_prompt', False):
                 # Use the custom prompt approach
@@ -123,38 +135,63 @@ class DocumentComparator:
                     doc2_content,
                     criterion
                 )
-            
-            # Calculate max tokens for the LLM response
-            prompt_tokens = len(self.tokenizer.encode(prompt))
+
+            # Estimate prompt length from the cached per-document token
+            # counts plus a conservative allowance for the prompt scaffold,
+            # instead of re-encoding both full documents for every
+            # criterion and pairing. Overestimating only nudges max_tokens
+            # toward its 1000-token floor.
+            prompt_tokens = (
+                self._document_tokens(doc1_name, doc1_content)
+                + self._document_tokens(doc2_name, doc2_content)
+                + self.PROMPT_SCAFFOLD_TOKENS
+            )
             max_tokens = max(1000, min(4096 - prompt_tokens - 50, 1500))
-            
-            # Evaluate this criterion
-            criterion_eval = self.criterion_evaluator.evaluate(prompt, max_tokens)
-            
+            prompts.append((prompt, max_tokens))
+
+        # Evaluate all criteria concurrently - each is an independent OpenAI
+        # call and wall time is dominated by API latency, so N criteria cost
+        # roughly one round trip instead of N. An empty criteria list skips
+        # the pool (max_workers=0 would raise) and falls through to a 0-0
+        # tie, as it did before the evaluations ran concurrently.
+        evaluations = []
+        if prompts:
+            print(f"Evaluating {len(prompts)} criteria concurrently...")
+            with ThreadPoolExecutor(max_workers=min(8, len(prompts))) as executor:
+                evaluations = list(executor.map(
+                    lambda args: self.criterion_evaluator.evaluate(*args), prompts
+                ))
+
+        # Aggregate the results in criteria order
+        for criterion, criterion_eval in zip(self.criteria, evaluations):
+            criterion_name = criterion['name']
+            criterion_weight = criterion['weight']
+            criterion_id = criterion.get('id', '')
+
             # Add criterion ID and name if not present
             if 'criterion_id' not in criterion_eval:
                 criterion_eval['criterion_id'] = criterion_id
-            
+
             if 'criterion_name' not in criterion_eval:
                 criterion_eval['criterion_name'] = criterion_name
-            
+
             # Calculate weighted scores for this criterion
             doc_a_score = criterion_eval.get('document_a_score', 0)
             doc_b_score = criterion_eval.get('document_b_score', 0)
-            
+
             # Update running totals
             weighted_a = (doc_a_score / 5) * criterion_weight  # Assuming 5 is max score
             weighted_b = (doc_b_score / 5) * criterion_weight
-            
+
             doc_a_weighted_score += weighted_a
             doc_b_weighted_score += weighted_b
-            
+
             # Store this criterion's evaluation
             all_criterion_evaluations.append(criterion_eval)
-            
+
             # Log progress
             winner = criterion_eval.get('winner', 'Tie')
-            print(f"    Scores - A: {doc_a_score}, B: {doc_b_score}, Winner: {winner}")
+            print(f"    {criterion_name} - A: {doc_a_score}, B: {doc_b_score}, Winner: {winner}")
         
         # Determine overall winner based on accumulated weighted scores
         overall_winner, winner_name, explanation = self._determine_winner(
@@ -113,8 +113,9 @@ def _merge_with_comparator(left: List[str], right: List[str], comparator: Callab
     """
     result = []
     i = j = 0
-    
-    while i < len(left) and j < len(right):
+    left_len, right_len = len(left), len(right)
+
+    while i < left_len and j < right_len:
         # Compare items using the comparator
         comparison_result = comparator(left[i], right[j])
         
@@ -2,9 +2,29 @@
 import os
 import fitz  # PyMuPDF
 import re
-import base64
+import hashlib
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
+# pybase64 decodes with SIMD acceleration (4-10x the stdlib decoder on
+# large payloads); fall back to the stdlib when it isn't installed
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+# Cache of extracted text shared across requests, keyed by
+# (path, mtime, size) so unchanged PDFs are never re-parsed
+_extracted_text_cache = {}
+_EXTRACTED_TEXT_CACHE_LIMIT = 128
+
+# On-disk cache of text extracted from base64 submissions, keyed by a
+# hash of the payload - clients commonly resend the same PDFs across
+# requests, and the cache survives process restarts
+_TEXT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'pdf_text_cache')
+
 class PDFProcessor:
     """
     Handles loading PDFs, extracting text, and identifying sections
@@ -42,23 +62,50 @@ class PDFProcessor:
             print("No PDF files found in the folder.")
             return {}
         
-        for filename in files:
-            file_path = os.path.join(self.pdf_folder, filename)
-            try:
-                # Use PyMuPDF to extract text from PDF
-                pdf_document = fitz.open(file_path)
-                text = ""
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document.load_page(page_num)
-                    text += page.get_text()
-                
-                self.pdf_contents[filename] = text
-                print(f"Loaded: {filename} ({len(text)} characters)")
-                
-            except Exception as e:
-                print(f"Error loading {filename}: {str(e)}")
-        
+        # Extraction is per-file independent work, so run the files across
+        # a thread pool - PyMuPDF does its parsing in C and releases the
+        # GIL, so multi-file loads scale close to linearly
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(files))) as executor:
+            for filename, text in executor.map(self._extract_one, files):
+                if text is not None:
+                    self.pdf_contents[filename] = text
+
         return self.pdf_contents
+
+    def _extract_one(self, filename: str):
+        """Extract text for one PDF file, consulting the shared cache.
+
+        Returns:
+            Tuple of (filename, text) - text is None if extraction failed
+        """
+        file_path = os.path.join(self.pdf_folder, filename)
+        try:
+            # Reuse previously extracted text if the file is unchanged
+            stat = os.stat(file_path)
+            cache_key = (file_path, stat.st_mtime_ns, stat.st_size)
+            cached_text = _extracted_text_cache.get(cache_key)
+            if cached_text is not None:
+                print(f"Loaded from cache: {filename} ({len(cached_text)} characters)")
+                return filename, cached_text
+
+            # Use PyMuPDF to extract text from PDF
+            pdf_document = fitz.open(file_path)
+            text = ""
+            for page_num in range(len(pdf_document)):
+                page = pdf_document.load_page(page_num)
+                text += page.get_text()
+            pdf_document.close()
+
+            if len(_extracted_text_cache) >= _EXTRACTED_TEXT_CACHE_LIMIT:
+                _extracted_text_cache.clear()
+            _extracted_text_cache[cache_key] = text
+
+            print(f"Loaded: {filename} ({len(text)} characters)")
+            return filename, text
+
+        except Exception as e:
+            print(f"Error loading {filename}: {str(e)}")
+            return filename, None
     
     def load_base64_pdf(self, filename: str, base64_content: str) -> str:
         """
@@ -75,28 +122,50 @@ class PDFProcessor:
             # Remove data URL prefix if present
             if ',' in base64_content:
                 base64_content = base64_content.split(',', 1)[1]
-                
-            # Decode base64 content
-            pdf_bytes = base64.b64decode(base64_content)
-            
-            # Save temporarily to disk to use PyMuPDF
-            temp_file_path = os.path.join(self.pdf_folder, filename)
-            with open(temp_file_path, 'wb') as f:
-                f.write(pdf_bytes)
-            
+
+            # The payload hash identifies the PDF bytes, so a resent
+            # document skips decode and extraction entirely
+            digest = hashlib.sha256(base64_content.encode('ascii', 'ignore')).hexdigest()
+            cache_path = os.path.join(_TEXT_CACHE_DIR, digest + '.txt')
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as cached:
+                    text = cached.read()
+                self.pdf_contents[filename] = text
+                print(f"Loaded base64 PDF from cache: {filename} ({len(text)} characters)")
+                return text
+            except OSError:
+                pass
+
+            # Decode in memory and hand the bytes straight to PyMuPDF - no
+            # write-then-reopen trip through the upload folder. The decoded
+            # PDF is only 3/4 the size of the base64 string already held,
+            # so this costs no meaningful extra memory.
+            pdf_bytes = b64decode(base64_content.encode('ascii'), validate=False)
+
             # Use PyMuPDF to extract text
-            pdf_document = fitz.open(temp_file_path)
+            pdf_document = fitz.open(stream=pdf_bytes, filetype='pdf')
             text = ""
             for page_num in range(len(pdf_document)):
                 page = pdf_document.load_page(page_num)
                 text += page.get_text()
             
             pdf_document.close()
-            
+
             # Store the extracted text
             self.pdf_contents[filename] = text
             print(f"Loaded base64 PDF: {filename} ({len(text)} characters)")
-            
+
+            # Persist for future requests; write-then-rename keeps readers
+            # from ever seeing a partial file
+            try:
+                os.makedirs(_TEXT_CACHE_DIR, exist_ok=True)
+                tmp_path = os.path.join(_TEXT_CACHE_DIR, f".{digest}.{uuid.uuid4().hex}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as out:
+                    out.write(text)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Could not cache extracted text for {filename}: {str(e)}")
+
             return text
             
         except Exception as e:
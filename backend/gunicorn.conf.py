@@ -0,0 +1,10 @@
+# Gunicorn configuration: gunicorn -c gunicorn.conf.py wsgi:app
+# Threaded workers so uploads, MongoDB I/O, and OpenAI calls overlap;
+# the long timeout covers multi-document comparison requests.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5003')}"
+workers = os.cpu_count() or 2
+threads = 4
+worker_class = "gthread"
+timeout = 300
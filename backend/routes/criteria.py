@@ -1,12 +1,37 @@
 # routes/criteria.py
-from flask import Blueprint, jsonify
+import gzip
+import json
+from flask import Blueprint, Response, request
 from comparisons.criteria_manager import CriteriaManager
 
 # Initialize blueprint
 criteria_bp = Blueprint('criteria', __name__)
 
+# The default criteria never change at runtime, so build and serialize
+# them once at import - the handler just returns the same bytes. The
+# gzipped variant is also compressed once, not per request.
+default_criteria = CriteriaManager().default_criteria
+default_criteria_json = json.dumps(default_criteria)
+default_criteria_gzip = gzip.compress(default_criteria_json.encode(), compresslevel=6)
+
+# Defaults only change with a deploy, so let browsers cache for an hour
+CACHE_CONTROL = 'public, max-age=3600'
+
 @criteria_bp.route('/criteria/default', methods=['GET'])
 def get_default_criteria():
     """Endpoint to get default criteria"""
-    criteria_manager = CriteriaManager()
-    return jsonify(criteria_manager.default_criteria)
\ No newline at end of file
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        return Response(
+            default_criteria_gzip,
+            mimetype='application/json',
+            headers={
+                'Content-Encoding': 'gzip',
+                'Vary': 'Accept-Encoding',
+                'Cache-Control': CACHE_CONTROL,
+            }
+        )
+    return Response(
+        default_criteria_json,
+        mimetype='application/json',
+        headers={'Cache-Control': CACHE_CONTROL}
+    )
\ No newline at end of file
@@ -1,14 +1,21 @@
 # routes/documents.py
 import os
-from flask import Blueprint, request, jsonify, current_app
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import get_jwt_identity
+import gridfs
+from pymongo import InsertOne, DeleteMany
 from comparisons.pdf_processor import PDFProcessor
-from comparisons.criteria_manager import CriteriaManager
 from comparisons.comparison_engine import ComparisonEngine
 from comparisons.report_generator import ReportGenerator
 from utils.db_connection import setup_mongodb_connection
-from utils.file_utils import clear_upload_folder
-from datetime import datetime
+from utils.file_utils import UPLOAD_MAX_AGE_SECONDS
+from routes.reports import invalidate_report_history
+from datetime import datetime, timedelta, timezone
 
 # Initialize blueprint
 documents_bp = Blueprint('documents', __name__)
@@ -16,6 +23,107 @@ documents_bp = Blueprint('documents', __name__)
 # Get database connection
 db = setup_mongodb_connection()
 
+# Background executor for comparison jobs so long-running LLM comparisons
+# don't have to hold an HTTP connection open (enqueue + poll pattern).
+# Task state lives in the comparison_tasks collection when MongoDB is
+# available: gunicorn runs multiple prefork workers, the future is owned
+# by whichever worker accepted the submit, and polls land on any of them
+# - only a shared registry lets every worker answer. A TTL index on
+# expires_at sweeps results nobody ever claims. The in-process dict
+# below is the fallback for db-less runs (the single-process dev server),
+# where each entry is {"future": ..., "finished_at": ...} and unclaimed
+# results are swept once they sit finished past the TTL.
+comparison_executor = ThreadPoolExecutor(max_workers=2)
+comparison_tasks = {}
+COMPARISON_RESULT_TTL_SECONDS = 15 * 60
+# Safety net for tasks orphaned before completing (e.g. a worker crash
+# mid-job) so their pending documents don't linger forever
+COMPARISON_PENDING_TTL_SECONDS = 24 * 60 * 60
+
+if db is not None:
+    try:
+        db["comparison_tasks"].create_index(
+            "expires_at", expireAfterSeconds=0, background=True
+        )
+    except Exception as e:
+        print(f"Warning: could not create comparison task TTL index: {e}")
+
+def _run_comparison_task(task_id, use_db_registry, *args):
+    """Background wrapper that runs the comparison and publishes the
+    result to the shared registry so any worker can serve the poll"""
+    payload, status_code = run_comparison(*args)
+    if use_db_registry:
+        try:
+            db["comparison_tasks"].update_one(
+                {"_id": task_id},
+                {"$set": {
+                    "status": "complete",
+                    "payload": payload,
+                    "status_code": status_code,
+                    "expires_at": datetime.now(timezone.utc)
+                    + timedelta(seconds=COMPARISON_RESULT_TTL_SECONDS),
+                }},
+            )
+        except Exception as e:
+            print(f"Could not publish result for task {task_id}: {str(e)}")
+    return payload, status_code
+
+def _mark_comparison_finished(task_id):
+    """Done-callback that timestamps a task's completion for the sweep"""
+    def callback(_future):
+        entry = comparison_tasks.get(task_id)
+        if entry is not None:
+            entry["finished_at"] = time.time()
+    return callback
+
+def _prune_comparison_tasks():
+    """Drop finished tasks whose results went unclaimed past the TTL"""
+    cutoff = time.time() - COMPARISON_RESULT_TTL_SECONDS
+    for task_id, entry in list(comparison_tasks.items()):
+        finished_at = entry.get("finished_at")
+        if finished_at is not None and finished_at < cutoff:
+            comparison_tasks.pop(task_id, None)
+
+# Entry counts recorded by upload_pdfs as (count, recorded_at), so the
+# comparison fallback check doesn't have to rescan the upload directory
+# on every request. Counts expire with the upload janitor's max file age
+# - past that point the files may have been swept, so fall back to the
+# directory scan rather than vouch for PDFs that no longer exist.
+upload_entry_counts = {}
+
+# ReportGenerator holds no per-request state (everything is passed into
+# generate_report), so one shared instance per output folder is enough
+report_generators = {}
+
+def report_generator_for(output_dir):
+    """Shared ReportGenerator for an output directory"""
+    generator = report_generators.get(output_dir)
+    if generator is None:
+        generator = report_generators.setdefault(output_dir, ReportGenerator(output_dir))
+    return generator
+
+def folder_has_min_entries(folder, minimum):
+    """
+    Cheap check that a folder holds at least `minimum` PDF files.
+
+    Trusts the count recorded by upload_pdfs when it is conclusive;
+    otherwise scans the directory, stopping as soon as enough PDFs are
+    seen instead of materializing the full listing.
+    """
+    count, recorded_at = upload_entry_counts.get(folder, (0, 0.0))
+    if count >= minimum and time.time() - recorded_at < UPLOAD_MAX_AGE_SECONDS:
+        return True
+    if not os.path.exists(folder):
+        return False
+    seen = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith('.pdf') and entry.is_file(follow_symlinks=False):
+                seen += 1
+                if seen >= minimum:
+                    return True
+    return False
+
 @documents_bp.route('/upload-pdfs', methods=['POST'])
 def upload_pdfs():
     """Endpoint to upload PDF files"""
@@ -36,13 +144,30 @@ def upload_pdfs():
     user_upload_folder = os.path.join(upload_folder, user_id)
     os.makedirs(user_upload_folder, exist_ok=True)
 
+    def save_pdf(file):
+        file_path = os.path.join(user_upload_folder, file.filename)
+        # Stream to disk with a 1 MiB buffer - far fewer write syscalls
+        # than file.save's default small-chunk copy on multi-MB PDFs
+        with open(file_path, 'wb') as destination:
+            shutil.copyfileobj(file.stream, destination, length=1024 * 1024)
+        return file_path
+
+    # Case-insensitive so .PDF uploads (common from Windows) aren't dropped
+    pdf_files = [file for file in files if file.filename.lower().endswith('.pdf')]
+
     saved_files = []
-    for file in files:
-        if file.filename.endswith('.pdf'):
-            filename = file.filename
-            file_path = os.path.join(user_upload_folder, filename)
-            file.save(file_path)
-            saved_files.append(file_path)
+    if pdf_files:
+        # Each save is independent disk I/O, so overlap them across a pool
+        # instead of writing the files one after another. Collect results
+        # per future so one bad file doesn't abort the whole batch.
+        with ThreadPoolExecutor(max_workers=min(8, len(pdf_files))) as executor:
+            futures = {executor.submit(save_pdf, file): file.filename for file in pdf_files}
+            for future in as_completed(futures):
+                try:
+                    saved_files.append(future.result())
+                except OSError as e:
+                    print(f"Error saving {futures[future]}: {str(e)}")
+        upload_entry_counts[user_upload_folder] = (len(saved_files), time.time())
 
     if not saved_files:
         return jsonify({"error": "No valid PDF files uploaded"}), 400
@@ -74,33 +199,147 @@ def compare_documents():
     custom_prompt = data.get('custom_prompt', '')
     documents_data = data.get('documents', [])
     report_name = data.get('report_name', '')
+    # 'single_batch' ranks every document in one LLM call - one round trip
+    # instead of O(N log N), at the cost of per-pair reasoning detail
+    ranking_mode = data.get('ranking_mode', 'pairwise')
     
     # Check if documents are provided in the request
     upload_folder = current_app.config['UPLOAD_FOLDER']
+    pdf_folder = upload_folder
     if not documents_data or len(documents_data) < 2:
-        # Check if PDFs are uploaded as fallback
-        if not os.path.exists(upload_folder) or len(os.listdir(upload_folder)) < 2:
+        # Check if PDFs are uploaded as fallback. upload_pdfs saves into
+        # (and records its count against) the user's subfolder, so check
+        # there first - that's the lookup the cache can answer - before
+        # falling back to scanning the shared upload root. Whichever
+        # folder satisfies the check is the one the PDFs are loaded from:
+        # the guard and PDFProcessor must agree, or the comparison would
+        # run over an empty folder the guard never looked at.
+        user_upload_folder = os.path.join(upload_folder, user_id)
+        if folder_has_min_entries(user_upload_folder, 2):
+            pdf_folder = user_upload_folder
+        elif not folder_has_min_entries(upload_folder, 2):
             return jsonify({"error": "Provide at least two documents for comparison"}), 400
         use_uploaded_pdfs = True
     else:
         use_uploaded_pdfs = False
-    
+
+    # Optionally run the comparison in the background and let the client
+    # poll /compare-status/<task_id> instead of holding the request open
+    if data.get('run_async'):
+        task_id = str(uuid.uuid4())
+        use_db_registry = False
+        if db is not None:
+            now = datetime.now(timezone.utc)
+            try:
+                db["comparison_tasks"].insert_one({
+                    "_id": task_id,
+                    "user_id": user_id,
+                    "status": "pending",
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=COMPARISON_PENDING_TTL_SECONDS),
+                })
+                use_db_registry = True
+            except Exception as e:
+                print(f"Task registry insert failed, tracking in-process: {str(e)}")
+
+        future = comparison_executor.submit(
+            _run_comparison_task, task_id, use_db_registry,
+            user_id, upload_folder, criteria_data, evaluation_method,
+            custom_prompt, documents_data, report_name, use_uploaded_pdfs,
+            ranking_mode, pdf_folder
+        )
+        if not use_db_registry:
+            _prune_comparison_tasks()
+            comparison_tasks[task_id] = {"future": future, "finished_at": None}
+            future.add_done_callback(_mark_comparison_finished(task_id))
+        return jsonify({"task_id": task_id, "status": "pending"}), 202
+
+    payload, status_code = run_comparison(
+        user_id, upload_folder, criteria_data, evaluation_method,
+        custom_prompt, documents_data, report_name, use_uploaded_pdfs,
+        ranking_mode, pdf_folder
+    )
+
+    # Clients that accept NDJSON get the results streamed one record per
+    # line - the comparison_details blob grows with every document pair,
+    # and line-at-a-time serialization keeps peak memory at one record.
+    # Everyone else gets the buffered JSON response as before.
+    if status_code == 200 and 'application/x-ndjson' in request.headers.get('Accept', ''):
+        def stream_results():
+            header = {key: payload[key] for key in
+                      ("message", "ranked_documents", "report_path")}
+            yield json.dumps(header) + "\n"
+            for detail in payload["comparison_details"]:
+                yield json.dumps(detail) + "\n"
+        return Response(stream_with_context(stream_results()),
+                        mimetype='application/x-ndjson')
+
+    return jsonify(payload), status_code
+
+@documents_bp.route('/compare-status/<task_id>', methods=['GET'])
+def get_comparison_status(task_id):
+    """Endpoint to poll the status of a background comparison job"""
+    # Shared registry first - under multi-worker gunicorn the poll rarely
+    # lands on the worker whose executor owns the future, and the Mongo
+    # document is the only view of the task every worker shares
+    if db is not None:
+        doc = db["comparison_tasks"].find_one({"_id": task_id})
+        if doc is not None:
+            if doc.get("status") != "complete":
+                return jsonify({"task_id": task_id, "status": "pending"})
+            # Claimed - return the result and drop it from the registry
+            db["comparison_tasks"].delete_one({"_id": task_id})
+            payload = doc["payload"]
+            payload["task_id"] = task_id
+            payload["status"] = "complete"
+            return jsonify(payload), doc.get("status_code", 200)
+
+    entry = comparison_tasks.get(task_id)
+    if entry is None:
+        return jsonify({"error": "Task not found"}), 404
+
+    future = entry["future"]
+    if not future.done():
+        return jsonify({"task_id": task_id, "status": "pending"})
+
+    # Job finished - return the result and drop it from the registry
+    comparison_tasks.pop(task_id, None)
+    payload, status_code = future.result()
+    payload["task_id"] = task_id
+    payload["status"] = "complete"
+    return jsonify(payload), status_code
+
+def run_comparison(user_id, upload_folder, criteria_data, evaluation_method,
+                   custom_prompt, documents_data, report_name, use_uploaded_pdfs,
+                   ranking_mode='pairwise', pdf_folder=None):
+    """
+    Run the full document comparison and report generation pipeline.
+
+    pdf_folder is the directory the uploaded-PDF fallback verified and
+    should load from (the user's subfolder, or the upload root for legacy
+    flat layouts); report output stays under upload_folder either way.
+
+    Returns a tuple of (response payload, HTTP status code) so it can be
+    used both synchronously and from a background worker.
+    """
     try:
         # Get OpenAI API key from environment variable
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             print("ERROR: OpenAI API key not found in environment variables")
-            return jsonify({"error": "OpenAI API key not configured"}), 401
-        
-        # Initialize components
-        pdf_processor = PDFProcessor(upload_folder)
-        criteria_manager = CriteriaManager()
+            return {"error": "OpenAI API key not configured"}, 401
         
-        # Configure criteria based on evaluation method
+        # PDFProcessor accumulates per-request state (extracted text and
+        # criteria sections), so it stays request-scoped. It reads from
+        # the folder the fallback check actually verified.
+        pdf_processor = PDFProcessor(pdf_folder or upload_folder)
+
+        # Build the criteria list for this request directly rather than
+        # routing it through a throwaway CriteriaManager instance
         if evaluation_method == 'criteria':
-            criteria_manager.criteria = criteria_data
+            criteria = criteria_data
         else:
-            criteria_manager.criteria = [{
+            criteria = [{
                 "id": "custom",
                 "name": "Custom Evaluation",
                 "description": custom_prompt,
@@ -113,41 +352,56 @@ def compare_documents():
         if use_uploaded_pdfs:
             pdf_contents = pdf_processor.load_pdfs()
         else:
-            for doc in documents_data:
+            def extract_document(doc):
                 doc_name = doc['name']
                 doc_content = doc['content']
-                
-                # Check if content is likely base64 encoded PDF
-                if doc_content.startswith('data:application/pdf;base64,') or (
-                    len(doc_content) > 100 and not doc_content.strip()[:20].isalpha()
+
+                # Check if content is likely base64 encoded PDF. Slice
+                # before stripping - strip() on the full string would copy
+                # a multi-MB payload just to inspect its first 20 chars.
+                # 'JVBER' is base64 for '%PDF', the magic of a bare payload.
+                head = doc_content[:64].lstrip()
+                if head.startswith(('data:application/pdf;base64,', 'JVBER')) or (
+                    len(doc_content) > 100 and not head[:20].isalpha()
                 ):
                     try:
-                        extracted_text = pdf_processor.load_base64_pdf(doc_name, doc_content)
-                        pdf_contents[doc_name] = extracted_text
+                        return doc_name, pdf_processor.load_base64_pdf(doc_name, doc_content)
                     except Exception as e:
                         print(f"Error processing base64 PDF: {str(e)}")
-                        pdf_contents[doc_name] = doc_content
-                else:
-                    pdf_contents[doc_name] = doc_content
+                        return doc_name, doc_content
+                return doc_name, doc_content
+
+            # Decode and extract the submitted documents in parallel - the
+            # same per-file independence load_pdfs already exploits
+            with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(documents_data))) as executor:
+                for doc_name, text in executor.map(extract_document, documents_data):
+                    pdf_contents[doc_name] = text
         
         # Initialize comparison engine
         comparison_engine = ComparisonEngine(
-            pdf_contents, 
-            criteria_manager.criteria, 
-            api_key, 
-            pdf_processor, 
-            use_custom_prompt=(evaluation_method == 'prompt')
+            pdf_contents,
+            criteria,
+            api_key,
+            pdf_processor,
+            use_custom_prompt=(evaluation_method == 'prompt'),
+            db=db
         )
 
-        # Initialize report generator
-        report_generator = ReportGenerator(upload_folder)
+        # Report generator shared across requests for this folder
+        report_generator = report_generator_for(upload_folder)
 
         # Get document list and run comparison
         pdf_list = list(pdf_contents.keys())
-        results = comparison_engine.compare_with_mergesort(pdf_list)
+        if ranking_mode == 'single_batch':
+            results = comparison_engine.compare_with_single_batch(pdf_list)
+        else:
+            results = comparison_engine.compare_with_mergesort(pdf_list)
 
-        # Generate report
-        folder_name = report_name if report_name else f"csv_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Generate report - one clock read shared by every name/timestamp
+        # derived below
+        now = datetime.now(timezone.utc)
+        now_tag = now.strftime('%Y%m%d_%H%M%S')
+        folder_name = report_name if report_name else f"csv_reports_{now_tag}"
         report_folder_path = report_generator.generate_report(
             pdf_list, 
             comparison_engine.comparison_results, 
@@ -157,56 +411,81 @@ def compare_documents():
         # Store report in MongoDB if connected
         if db is not None:
             try:
-                # Get all CSV files in the report folder
+                # Store CSV contents in GridFS and keep only references in
+                # the report document, so report inserts stay small and the
+                # 16 MB BSON document cap can never reject a large report
+                csv_bucket = gridfs.GridFSBucket(db, bucket_name="report_csvs")
                 csv_files = []
                 if os.path.exists(report_folder_path):
-                    for filename in os.listdir(report_folder_path):
-                        if filename.endswith('.csv'):
-                            csv_file = {}
-                            file_path = os.path.join(report_folder_path, filename)
-                            # Read file content
-                            with open(file_path, 'r') as file:
-                                csv_content = file.read()
-                            csv_file[filename] = csv_content
-                            csv_files.append(csv_file)
-                            
+                    # scandir reuses the d_type from the directory read, so
+                    # no extra stat per entry like listdir + isfile would do
+                    with os.scandir(report_folder_path) as entries:
+                        for entry in entries:
+                            if entry.name.endswith('.csv') and entry.is_file(follow_symlinks=False):
+                                with open(entry.path, 'rb') as file:
+                                    gridfs_id = csv_bucket.upload_from_stream(entry.name, file)
+                                csv_files.append({"filename": entry.name, "gridfs_id": gridfs_id})
+
                 # Check API key status
                 api_key_status = "Valid API key" if len(api_key) > 20 else "Invalid or missing API key"
                             
                 # Prepare report data
                 report_data = {
                     "user_id": user_id,  # user_id associates reports with specific user
-                    "timestamp": datetime.now().isoformat(),
+                    # Native BSON Date - 8-byte sort/compare keys instead of
+                    # ISO string compares, and no parsing on later reads
+                    "timestamp": now,
                     "documents": pdf_list,
                     "top_ranked": results[0] if results else None,
                     "csv_files": csv_files,
-                    "criteria_count": len(criteria_manager.criteria),
+                    "criteria_count": len(criteria),
                     "evaluation_method": evaluation_method,
                     "custom_prompt": custom_prompt if evaluation_method == 'prompt' else "",
-                    "report_name": report_name if report_name else f"Report {datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                    "report_name": report_name if report_name else f"Report {now_tag}",
                     "api_key_status": api_key_status
                 }
                 
                 # Store report in database
                 reports_collection = db["reports"]
-                reports_collection.insert_one(report_data)
-                
-                # Limit to 3 most recent reports
-                all_reports = list(reports_collection.find({"user_id": user_id}).sort("timestamp", -1))
-                if len(all_reports) > 5:
-                    reports_to_delete = all_reports[5:]
-                    report_ids = [report["_id"] for report in reports_to_delete]
-                    reports_collection.delete_many({"_id": {"$in": report_ids}})
+
+                # Limit to the 5 most recent reports - fetch only the _id of
+                # anything older instead of pulling every report (with its
+                # csv_files payload) back just to slice the list in Python.
+                # Anything past the 4 newest existing reports falls off the
+                # cap once the new one is added, so the insert and the prune
+                # can go out together as a single bulk_write round trip.
+                excess_reports = list(
+                    reports_collection.find({"user_id": user_id}, {"csv_files.gridfs_id": 1})
+                        .sort("_id", -1)
+                        .skip(4)
+                )
+                operations = [InsertOne(report_data)]
+                if excess_reports:
+                    excess_ids = [report["_id"] for report in excess_reports]
+                    operations.append(DeleteMany({"_id": {"$in": excess_ids}}))
+                reports_collection.bulk_write(operations, ordered=True)
+
+                # Drop the GridFS files belonging to the pruned reports
+                for report in excess_reports:
+                    for entry in report.get("csv_files", []):
+                        if isinstance(entry, dict) and "gridfs_id" in entry:
+                            try:
+                                csv_bucket.delete(entry["gridfs_id"])
+                            except Exception:
+                                pass
+
+                # The user's history changed, so drop their cached response
+                invalidate_report_history(user_id)
                     
             except Exception as e:
                 print(f"Error storing report history: {str(e)}")
                 
-        return jsonify({
+        return {
             "message": "Comparison completed successfully",
             "ranked_documents": results,
             "comparison_details": comparison_engine.comparison_results,
             "report_path": report_folder_path
-        })
-                
+        }, 200
+
     except Exception as e:
-        return jsonify({"error": f"Error during comparison: {str(e)}"}), 500
\ No newline at end of file
+        return {"error": f"Error during comparison: {str(e)}"}, 500
\ No newline at end of file
@@ -6,16 +6,101 @@ from utils.db_connection import setup_mongodb_connection
 from utils.report_utils import create_zip_from_report_data, format_timestamp
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import pandas as pd
+import io
 import json
 import os
+import time
+from collections import OrderedDict
 
 # Initialize blueprint
 reports_bp = Blueprint('reports', __name__)
 
+# Built once - ZoneInfo construction does tzdata file I/O on a miss
+SGT = ZoneInfo("Asia/Singapore")
+
 # Get database connection
 db = setup_mongodb_connection()
 
+# Short-lived per-user cache for report history responses - the frontend
+# polls this endpoint but the data only changes when a report is stored
+report_history_cache = {}
+REPORT_HISTORY_CACHE_SECONDS = 60
+
+# Report documents cached for the download endpoints - the zip bytes are
+# immutable once stored, and a rename invalidates below
+report_doc_cache = {}
+REPORT_DOC_CACHE_SECONDS = 60
+
+def invalidate_report_history(user_id):
+    """Drop the cached report history for a user after their reports change"""
+    report_history_cache.pop(user_id, None)
+    for key in [k for k in report_doc_cache if k[0] == user_id]:
+        report_doc_cache.pop(key, None)
+
+def find_report_cached(user_id, timestamp=None):
+    """
+    Fetch a user's report by timestamp key (or the latest when None),
+    serving repeat downloads from a short-lived cache instead of a
+    MongoDB round trip per click.
+    """
+    key = (user_id, timestamp)
+    cached = report_doc_cache.get(key)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    # The downloads only need the CSV references, the name, and the _id
+    # (ETag) - skip the documents list and the rest of the metadata
+    projection = {"csv_files": 1, "report_name": 1}
+
+    reports_collection = db["reports"]
+    if timestamp is None:
+        report = reports_collection.find_one(
+            {"user_id": user_id}, projection, sort=[("_id", -1)]
+        )
+    else:
+        report = reports_collection.find_one({
+            "timestamp": timestamp_filter(timestamp),
+            "user_id": user_id
+        }, projection)
+    report_doc_cache[key] = (time.time() + REPORT_DOC_CACHE_SECONDS, report)
+    return report
+
+def timestamp_filter(timestamp):
+    """
+    Build the timestamp match for a report looked up by URL key.
+
+    New reports store a native BSON Date while older ones stored the ISO
+    string verbatim, so match either the parsed datetime or the raw string.
+    """
+    values = [timestamp]
+    try:
+        values.append(datetime.fromisoformat(timestamp))
+    except ValueError:
+        pass
+    return {"$in": values}
+
+# Built zip archives cached by report id - reports are immutable once
+# stored, so a repeat download can reuse the bytes instead of re-zipping
+zip_cache = OrderedDict()
+ZIP_CACHE_MAX_ENTRIES = 8
+
+def zip_buffer_for_report(report):
+    """Return a BytesIO of the report's zip bundle, reusing a cached build"""
+    report_id = str(report.get("_id"))
+    cached = zip_cache.get(report_id)
+    if cached is not None:
+        zip_cache.move_to_end(report_id)
+        return io.BytesIO(cached)
+
+    zip_buffer = create_zip_from_report_data(report, db)
+    if zip_buffer is None:
+        return None
+
+    zip_cache[report_id] = zip_buffer.getvalue()
+    if len(zip_cache) > ZIP_CACHE_MAX_ENTRIES:
+        zip_cache.popitem(last=False)
+    return zip_buffer
+
 @reports_bp.route('/download-report', methods=['GET'])
 @jwt_required()  # Add JWT requirement
 def download_report():
@@ -28,30 +113,34 @@ def download_report():
         current_user = get_jwt_identity()
         user_id = current_user.get('id')
             
-        # Get the most recent report from the database
-        reports_collection = db["reports"]
-        latest_report = reports_collection.find_one({"user_id" : user_id}, sort=[("timestamp", -1)])
-        
+        # Get the most recent report (cached; _id sorting gives
+        # newest-first by insertion time)
+        latest_report = find_report_cached(user_id)
+
         if not latest_report or "csv_files" not in latest_report:
             return jsonify({"error": "Report not found"}), 404
         
-        # Create zip file in memory
-        zip_buffer = create_zip_from_report_data(latest_report)
+        # Create zip file in memory (or reuse a cached build)
+        zip_buffer = zip_buffer_for_report(latest_report)
         if not zip_buffer:
             return jsonify({"error": "Error creating report zip file"}), 500
         
         # Format timestamp for filename
-        timestamp = datetime.now().astimezone(ZoneInfo("Asia/Singapore"))
+        timestamp = datetime.now().astimezone(SGT)
         formatted_timestamp = timestamp.strftime("%d%b%Y-%H%M%S")
         
         # Get report name
         report_name = latest_report.get("report_name", f"document_comparison_report_{formatted_timestamp}")
-        
+
+        # Reports are immutable once stored, so the _id is a stable ETag -
+        # with conditional=True repeat downloads revalidate to a 304
         return send_file(
             zip_buffer,
             as_attachment=True,
             download_name=f"{report_name}.zip",
-            mimetype="application/zip"
+            mimetype="application/zip",
+            conditional=True,
+            etag=str(latest_report["_id"])
         )
 
     except Exception as e:
@@ -70,11 +159,18 @@ def get_report_history():
         current_user = get_jwt_identity()
         user_id = current_user.get('id')
 
+        # Serve from the per-user cache while it is still fresh
+        cached = report_history_cache.get(user_id)
+        if cached and cached[0] > time.time():
+            return jsonify(cached[1])
+
         # Get reports collection
         reports_collection = db["reports"]
-        
-        # Get the 5 most recent reports, sorted by timestamp
-        reports = list(reports_collection.find({"user_id" : user_id}, {
+
+        # Get the 5 most recent reports, formatting timestamps in the same
+        # pass that drains the cursor instead of materializing the list
+        # first and walking it again
+        cursor = reports_collection.find({"user_id" : user_id}, {
             "_id": 0,  # Exclude MongoDB ID
             "timestamp": 1,
             "documents": 1,
@@ -83,16 +179,18 @@ def get_report_history():
             "criteria_count": 1,
             "evaluation_method": 1,
             "custom_prompt": 1
-        }).sort("timestamp", -1).limit(5))
-        
-        # Format timestamps
-        for report in reports:
+        }).sort("_id", -1).limit(5)
+
+        reports = []
+        for report in cursor:
             timestamp = report.get("timestamp")
             if isinstance(timestamp, datetime):
                 # Convert to Asia/Singapore timezone
-                timestamp = timestamp.astimezone(ZoneInfo("Asia/Singapore"))
-                report["timestamp"] = timestamp.isoformat()
-        
+                report["timestamp"] = timestamp.astimezone(SGT).isoformat()
+            reports.append(report)
+
+        report_history_cache[user_id] = (time.time() + REPORT_HISTORY_CACHE_SECONDS, reports)
+
         return jsonify(reports)
     except Exception as e:
         return jsonify({"error": f"Error retrieving report history: {str(e)}"}), 500
@@ -113,22 +211,25 @@ def get_report_data(timestamp):
         
         # Find the report with the matching timestamp AND user_id
         report = reports_collection.find_one({
-            "timestamp": timestamp,
+            "timestamp": timestamp_filter(timestamp),
             "user_id": user_id  # Add user_id filter
         })
-        
+
         if not report:
             return jsonify({"error": "Report not found"}), 404
-        
+
         # Get path to CSV files
         csv_folder = report.get("csv_files")
         if not csv_folder or not os.path.exists(csv_folder):
             return jsonify({"error": "CSV files not found"}), 404
-        
+
         # Check for wins summary CSV which has the most important data
         wins_csv = os.path.join(csv_folder, "document_wins.csv")
         if os.path.exists(wins_csv):
             try:
+                # Deferred - pandas is heavy and only these CSV-reading
+                # endpoints need it
+                import pandas as pd
                 df = pd.read_csv(wins_csv)
                 # Format for visualization
                 data = [{
@@ -169,22 +270,23 @@ def get_pairwise_data(timestamp):
         
         # Find the report with the matching timestamp AND user_id
         report = reports_collection.find_one({
-            "timestamp": timestamp,
+            "timestamp": timestamp_filter(timestamp),
             "user_id": user_id  # Add user_id filter
         })
-        
+
         if not report:
             return jsonify({"error": "Report not found"}), 404
-        
+
         # Get path to CSV files
         csv_folder = report.get("csv_files")
         if not csv_folder or not os.path.exists(csv_folder):
             return jsonify({"error": "CSV files not found"}), 404
-        
+
         # Check for comparisons CSV which has the detailed comparison data
         comparisons_csv = os.path.join(csv_folder, "comparisons.csv")
         if os.path.exists(comparisons_csv):
             try:
+                import pandas as pd
                 df = pd.read_csv(comparisons_csv)
                 # Format for frontend display
                 data = []
@@ -225,20 +327,14 @@ def download_specific_report(timestamp):
         current_user = get_jwt_identity()
         user_id = current_user.get('id')
         
-        # Get reports collection
-        reports_collection = db["reports"]
-        
-        # Find the report with the matching timestamp AND user_id
-        report = reports_collection.find_one({
-            "timestamp": timestamp,
-            "user_id": user_id  # Add user_id filter
-        })
-        
+        # Find the report with the matching timestamp AND user_id (cached)
+        report = find_report_cached(user_id, timestamp)
+
         if not report or "csv_files" not in report:
             return jsonify({"error": "Report not found"}), 404
         
-        # Create zip file in memory
-        zip_buffer = create_zip_from_report_data(report)
+        # Create zip file in memory (or reuse a cached build)
+        zip_buffer = zip_buffer_for_report(report)
         if not zip_buffer:
             return jsonify({"error": "Error creating report zip file"}), 500
         
@@ -247,12 +343,15 @@ def download_specific_report(timestamp):
         
         # Use the custom report name if available
         report_name = report.get("report_name", f"document_comparison_report_{formatted_timestamp}")
-        
+
+        # Same conditional/ETag handling as the latest-report download
         return send_file(
             zip_buffer,
             as_attachment=True,
             download_name=f"{report_name}.zip",
-            mimetype="application/zip"
+            mimetype="application/zip",
+            conditional=True,
+            etag=str(report["_id"])
         )
     
     except Exception as e:
@@ -287,13 +386,15 @@ def update_report_name():
         # Update the report name ONLY if it belongs to the current user
         result = reports_collection.update_one(
             {
-                "timestamp": timestamp,
+                "timestamp": timestamp_filter(timestamp),
                 "user_id": user_id  # Add user_id filter
             },
             {"$set": {"report_name": new_name}}
         )
         
         if result.modified_count > 0:
+            # The renamed report appears in the history payload
+            invalidate_report_history(user_id)
             return jsonify({
                 "success": True,
                 "message": "Report name updated successfully"
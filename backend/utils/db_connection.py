@@ -15,9 +15,20 @@ def connect_to_mongodb(connection_string, max_retries=3, retry_delay=2):
 
     while retries < max_retries:
         try:
-            # Create a connection using MongoClient
-            client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
-            
+            # Create a connection using MongoClient with an explicit
+            # connection pool shared by all request threads
+            client = MongoClient(
+                connection_string,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=50,
+                minPoolSize=5,
+                maxIdleTimeMS=300_000,
+                retryWrites=True,
+                # Negotiated with the server - ignored when unsupported.
+                # Report payloads are redundant CSV text that deflates well.
+                compressors="zlib",
+            )
+
             # Test the connection
             client.admin.command('ping')
             print("Successfully connected to MongoDB!")
@@ -39,8 +50,17 @@ def connect_to_mongodb(connection_string, max_retries=3, retry_delay=2):
 def get_database(client, db_name):
     return client[db_name]
 
+# Cached database handle so every caller shares one pooled client
+_cached_db = None
+
 # Example usage in your backend server
 def setup_mongodb_connection():
+    # Reuse the existing connection - each route module calls this at
+    # import time and they should all share a single connection pool
+    global _cached_db
+    if _cached_db is not None:
+        return _cached_db
+
     # Connect to MongoDB
     if not connection_string:
         print("Warning: MongoDB connection string is not set in environment variables")
@@ -58,11 +78,18 @@ def setup_mongodb_connection():
         # Get the database
         db = get_database(client, db_name)
         print(f"Connected to MongoDB database: {db_name}")
+
+        # Index the fields the report endpoints filter and sort on, so the
+        # per-user history and retention queries use an index scan instead
+        # of an in-memory sort over the whole collection
+        try:
+            db["reports"].create_index([("user_id", 1), ("timestamp", -1)], background=True)
+        except Exception as e:
+            print(f"Warning: could not create reports index: {e}")
+
+        _cached_db = db
         return db
     else:
         print("Unable to connect to MongoDB. Check your connection string and ensure MongoDB is running.")
         print(f"Connection string format should be: mongodb://[username:password@]host[:port]/[database]")
         return None
-
-# In your main server code (e.g., with Flask or FastAPI)
-db = setup_mongodb_connection()
@@ -1,21 +1,86 @@
 import os
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# How long uploaded PDFs may sit on disk before the janitor removes them,
+# and how often it looks
+UPLOAD_MAX_AGE_SECONDS = 30 * 60
+UPLOAD_JANITOR_INTERVAL_SECONDS = 5 * 60
+
+_janitor_thread = None
 
 def setup_upload_folder():
     """Setup folder for temporary file uploads"""
     UPLOAD_FOLDER = os.path.join(tempfile.gettempdir(), 'pdf_comparison_uploads')
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
+    # exist_ok skips the separate exists() stat and is race-free when
+    # several prefork workers bootstrap at once
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
     return UPLOAD_FOLDER
 
 def clear_upload_folder(folder_path):
     """Clear all files from upload folder"""
     try:
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            if os.path.isfile(file_path):
-                os.unlink(file_path)
+        # DirEntry.is_file avoids the extra stat that os.path.isfile costs
+        # for every entry in the listdir-based loop
+        with os.scandir(folder_path) as entries:
+            file_paths = [entry.path for entry in entries if entry.is_file(follow_symlinks=False)]
+
+        if not file_paths:
+            return True
+
+        def unlink_quietly(path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass  # tolerate files removed by a concurrent cleanup
+
+        # The unlinks are independent, so overlap them across a small pool
+        with ThreadPoolExecutor(max_workers=min(8, len(file_paths))) as executor:
+            list(executor.map(unlink_quietly, file_paths))
         return True
     except Exception as e:
         print(f"Error clearing upload folder: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def remove_stale_uploads(folder_path, max_age_seconds=UPLOAD_MAX_AGE_SECONDS):
+    """Delete uploaded files older than max_age_seconds, including inside
+    the per-user subfolders"""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for dirpath, _, filenames in os.walk(folder_path):
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            try:
+                if os.stat(file_path).st_mtime < cutoff:
+                    os.unlink(file_path)
+                    removed += 1
+            except OSError:
+                pass  # tolerate files removed by a concurrent comparison run
+    return removed
+
+def start_upload_janitor(folder_path):
+    """Start the background thread that periodically removes stale uploads.
+
+    Cleanup used to run inside the upload request itself; doing it off the
+    request path keeps uploads fast and avoids deleting files a concurrent
+    comparison is still reading. Idempotent - repeat calls reuse the thread.
+    """
+    global _janitor_thread
+    if _janitor_thread is not None:
+        return _janitor_thread
+
+    def janitor():
+        while True:
+            time.sleep(UPLOAD_JANITOR_INTERVAL_SECONDS)
+            try:
+                removed = remove_stale_uploads(folder_path)
+                if removed:
+                    print(f"Upload janitor removed {removed} stale file(s)")
+            except Exception as e:
+                print(f"Upload janitor error: {str(e)}")
+
+    _janitor_thread = threading.Thread(target=janitor, name="upload-janitor", daemon=True)
+    _janitor_thread.start()
+    return _janitor_thread
\ No newline at end of file
@@ -1,28 +1,52 @@
 import os
 import io
 import zipfile
+import gridfs
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-def create_zip_from_report_data(report_data):
+# Shared timezone object - constructing ZoneInfo reads tzdata on a miss
+SGT = ZoneInfo("Asia/Singapore")
+
+def create_zip_from_report_data(report_data, db=None):
     """Create a zip file in memory from report data"""
     try:
         # Create a zip buffer in memory
         zip_buffer = io.BytesIO()
-        
+
         # Get file data
         file_data = report_data["csv_files"]
-        
-        # Create a zip file in memory
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+
+        csv_bucket = gridfs.GridFSBucket(db, bucket_name="report_csvs") if db is not None else None
+
+        # Below this size the deflate headers eat the savings, so tiny
+        # CSVs go in stored rather than paying the compressor for nothing
+        STORE_THRESHOLD = 4096
+
+        def write_entry(zip_file, filename, content):
+            compress_type = zipfile.ZIP_STORED if len(content) < STORE_THRESHOLD else zipfile.ZIP_DEFLATED
+            zip_file.writestr(filename, content, compress_type=compress_type)
+
+        # Create a zip file in memory. compresslevel=1 still shrinks the
+        # highly redundant CSV text substantially but costs a fraction of
+        # the default deflate level's CPU on the request path.
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
             for file_dict in file_data:
-                for filename, content in file_dict.items():
-                    # Write each CSV to the zip file
-                    zip_file.writestr(filename, content)
-        
+                if "gridfs_id" in file_dict:
+                    # CSV content lives in GridFS; the report document only
+                    # holds a reference
+                    if csv_bucket is None:
+                        raise ValueError("Report references GridFS but no database was provided")
+                    content = csv_bucket.open_download_stream(file_dict["gridfs_id"]).read()
+                    write_entry(zip_file, file_dict["filename"], content)
+                else:
+                    # Legacy reports store {filename: content} inline
+                    for filename, content in file_dict.items():
+                        write_entry(zip_file, filename, content)
+
         # Move to the beginning of the BytesIO buffer
         zip_buffer.seek(0)
-        
+
         return zip_buffer
     except Exception as e:
         print(f"Error creating zip file: {str(e)}")
@@ -36,7 +60,7 @@ def format_timestamp(timestamp):
             timestamp = datetime.fromisoformat(timestamp)
             
         # Convert to Asia/Singapore timezone
-        timestamp = timestamp.astimezone(ZoneInfo("Asia/Singapore"))
+        timestamp = timestamp.astimezone(SGT)
         
         # Format: DD-MMM-YYYY_HHMMSS (e.g., 22-Apr-2025_100000)
         return timestamp.strftime("%d%b%Y-%H%M%S")
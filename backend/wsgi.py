@@ -0,0 +1,7 @@
+# WSGI entry point for production servers, e.g.:
+#   gunicorn -w 4 --threads 8 -b 0.0.0.0:$PORT wsgi:app
+# The dev server remains available via `python api.py`.
+from api import app
+
+if __name__ == "__main__":
+    app.run()